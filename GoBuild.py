@@ -2,166 +2,687 @@ import sublime
 import sublime_plugin
 import subprocess
 import os
+import bisect
+import difflib
+import functools
 import threading
+import concurrent.futures
+import time
 import json
 import re
+import shutil
 from pathlib import Path
 
 
+# Absolute paths of the Go tools, resolved once so each subprocess skips the PATH search
+_GO_BIN = shutil.which('go') or 'go'
+_GOFMT_BIN = shutil.which('gofmt') or 'gofmt'
+_GOIMPORTS_BIN = shutil.which('goimports') or 'goimports'
+
+
+def _resolve_binaries():
+    """Resolve the configured Go executables to absolute paths"""
+    global _GO_BIN, _GOFMT_BIN, _GOIMPORTS_BIN
+
+    settings = sublime.load_settings("GoBuild.sublime-settings")
+    go = settings.get("go_executable", "go")
+    gofmt = settings.get("gofmt_executable", "gofmt")
+    goimports = settings.get("goimports_executable", "goimports")
+
+    _GO_BIN = shutil.which(go) or go
+    _GOFMT_BIN = shutil.which(gofmt) or gofmt
+    _GOIMPORTS_BIN = shutil.which(goimports) or goimports
+
+
+# Shared worker pools, so bursts of commands queue up instead of each spawning
+# its own thread. Long-running go commands (build, run, test, ...) get their own
+# pool so they can't hold up quick editor tasks (fmt, imports, doc, env, playground).
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='gobuild')
+_EDITOR_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='gobuild-editor')
+
+# Kept-alive connection to the Go Playground, shared by all submissions
+_playground_conn = None
+_playground_lock = threading.Lock()
+
+# Patterns for the file detection helpers, searched with Sublime's view.find/find_all
+_IMPORT_PATTERN = r'import\s+(?:"([^"]+)"|`([^`]+)`)'
+_MAIN_FUNC_PATTERN = r'func\s+main\s*\('
+_TEST_FUNC_PATTERN = r'func\s+(Test\w+)'
+
+# Import prefixes containing dots that are still treated as standard library
+_STD_DOT_PREFIXES = (
+    'golang.org/x/crypto',
+    'golang.org/x/net',
+    'golang.org/x/text',
+    'golang.org/x/sys',
+    'golang.org/x/time',
+)
+
+# Commands that always need modules
+_MODULE_REQUIRED_COMMANDS = frozenset(('get', 'mod', 'install'))
+# Commands that work without modules for single files
+_SINGLE_FILE_COMMANDS = frozenset(('run', 'fmt', 'vet'))
+_BUILD_TEST_COMMANDS = frozenset(('build', 'test'))
+
+# Views being re-saved after format on save, so the save doesn't trigger another format
+_resaving_views = set()
+
+# window id -> the "go_output" panel, reused across commands
+_panels = {}
+
+# (view id, change count, file name) -> (is_single_file_program, is_simple_multi_file_main)
+_detect_cache = {}
+_DETECT_CACHE_SIZE = 32
+
+# directory -> (timestamp, nearest directory containing go.mod or None)
+_project_root_cache = {}
+_PROJECT_ROOT_TTL = 5.0
+_PROJECT_ROOT_CACHE_SIZE = 64
+
+# Parsed `go env -json` output, refreshed after _GO_ENV_TTL seconds or on demand
+_go_env_cache = None
+_go_env_time = 0.0
+_GO_ENV_TTL = 60.0
+# Single keys fetched through get_go_env_keys: key -> (timestamp, value)
+_go_env_key_cache = {}
+
+
+def _walk_for_gomod(start):
+    """Walk up from `start` and return the first directory containing go.mod"""
+    d = start
+    while True:
+        if os.path.isfile(d + os.sep + 'go.mod'):
+            return d
+        parent = os.path.dirname(d)
+        if parent == d:
+            return None
+        d = parent
+
+
+def _nearest_go_mod_dir(directory):
+    """Find the closest directory at or above `directory` containing go.mod"""
+    now = time.monotonic()
+    cached = _project_root_cache.get(directory)
+    if cached and now - cached[0] < _PROJECT_ROOT_TTL:
+        return cached[1]
+
+    root = _walk_for_gomod(directory)
+    # Re-insert refreshed keys so they move to the end and aren't evicted first
+    _project_root_cache.pop(directory, None)
+    _project_root_cache[directory] = (now, root)
+    if root:
+        # Callers commonly re-check the root itself, e.g. has_go_mod(get_project_root())
+        _project_root_cache.pop(root, None)
+        _project_root_cache[root] = (now, root)
+
+    while len(_project_root_cache) > _PROJECT_ROOT_CACHE_SIZE:
+        _project_root_cache.pop(next(iter(_project_root_cache)))
+    return root
+
+
+# One line including its LSP line ending (\n, \r\n or \r), or a final unterminated line
+_LSP_LINE_RE = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$')
+
+
+def _utf16_len(text):
+    """Length of `text` in UTF-16 code units, as used by LSP positions"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _apply_text_edits(text, edits):
+    """Apply LSP TextEdits to `text` and return the new string"""
+    # LSP only breaks lines on \n, \r\n and \r, unlike str.splitlines
+    lines = _LSP_LINE_RE.findall(text)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    def to_offset(position):
+        line_num = position['line']
+        if line_num >= len(lines):
+            return len(text)
+        line = lines[line_num]
+        # Convert the UTF-16 character offset into a code point offset
+        units = 0
+        for index, char in enumerate(line):
+            if units >= position['character']:
+                return line_starts[line_num] + index
+            units += 2 if ord(char) > 0xFFFF else 1
+        return line_starts[line_num] + len(line)
+
+    spans = []
+    for index, edit in enumerate(edits):
+        spans.append((to_offset(edit['range']['start']), index,
+                      to_offset(edit['range']['end']),
+                      edit['newText']))
+
+    # Apply from the end so earlier offsets stay valid; edits sharing a start
+    # run in reverse array order so they end up in array order in the text
+    for start, _, end, new_text in sorted(spans, key=lambda span: span[:2], reverse=True):
+        text = text[:start] + new_text + text[end:]
+    return text
+
+
+@functools.lru_cache(maxsize=256)
+def _go_doc(symbol, go_version, cwd):
+    """Run `go doc` for a symbol; successful lookups are cached per Go version.
+
+    Failures raise instead of returning so that they are not cached.
+    """
+    result = subprocess.run([_GO_BIN, 'doc', symbol], cwd=cwd, capture_output=True,
+                          text=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"No documentation found for {symbol}")
+    return result.stdout
+
+
+def _playground_share(content):
+    """Upload source to the Go Playground and return the share id.
+
+    The HTTPS connection is kept open between calls so later submissions
+    skip the TCP and TLS handshake.
+    """
+    import http.client
+
+    global _playground_conn
+    body = content.encode('utf-8')
+
+    with _playground_lock:
+        for attempt in range(2):
+            if _playground_conn is None:
+                _playground_conn = http.client.HTTPSConnection('play.golang.org', timeout=10)
+
+            try:
+                _playground_conn.request('POST', '/share', body=body,
+                                         headers={'Content-Type': 'text/plain; charset=utf-8'})
+                response = _playground_conn.getresponse()
+                data = response.read().decode()
+            except Exception as e:
+                _playground_conn.close()
+                _playground_conn = None
+                # The server may have dropped the idle connection; retry once on a fresh one
+                if attempt == 0 and isinstance(e, ConnectionError):
+                    continue
+                raise
+
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status} {response.reason}")
+            return data.strip()
+
+
+class _GoplsClient:
+    """Minimal JSON-RPC client for a long-lived `gopls serve` process"""
+
+    _instance = None
+    _unavailable = False
+    _retry_after = 0.0
+    _lock = threading.Lock()
+
+    # Seconds to wait before trying to start gopls again after it failed to initialize
+    RETRY_DELAY = 60.0
+
+    @classmethod
+    def enabled(cls):
+        """Check, without starting anything, whether gopls may be used"""
+        settings = sublime.load_settings("GoBuild.sublime-settings")
+        return (settings.get("use_gopls", True) and not cls._unavailable and
+                time.monotonic() >= cls._retry_after)
+
+    @classmethod
+    def get(cls):
+        """Return the shared client, starting gopls on first use, or None if unavailable.
+
+        Starting gopls blocks until it initializes, so call this off the UI thread.
+        """
+        if not cls.enabled():
+            return None
+
+        with cls._lock:
+            if cls._instance is None or not cls._instance.alive():
+                cls._instance = None
+                # Another thread may have failed to start gopls while we waited for the lock
+                if time.monotonic() < cls._retry_after:
+                    return None
+                settings = sublime.load_settings("GoBuild.sublime-settings")
+                try:
+                    cls._instance = cls(settings.get("gopls_executable", "gopls"))
+                except FileNotFoundError:
+                    # Don't retry on every command when gopls isn't installed
+                    cls._unavailable = True
+                except Exception as e:
+                    # gopls hung or failed to initialize; back off instead of respawning each time
+                    print(f"Failed to start gopls: {e}")
+                    cls._retry_after = time.monotonic() + cls.RETRY_DELAY
+            return cls._instance
+
+    @classmethod
+    def stop(cls):
+        """Shut down the shared client if it is running"""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.shutdown()
+                cls._instance = None
+            cls._unavailable = False
+            cls._retry_after = 0.0
+
+    def __init__(self, executable):
+        self.process = subprocess.Popen([executable, 'serve'], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._next_id = 0
+        self._pending = {}
+        self._versions = {}
+        self._write_lock = threading.Lock()
+        # Serializes document syncs and the requests that depend on them
+        self._document_lock = threading.RLock()
+
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        try:
+            self.request('initialize', {
+                'processId': os.getpid(),
+                'rootUri': None,
+                'capabilities': {
+                    'textDocument': {
+                        # Ask for code actions that carry their edits, not bare commands
+                        'codeAction': {
+                            'codeActionLiteralSupport': {
+                                'codeActionKind': {'valueSet': ['source.organizeImports']}
+                            }
+                        }
+                    }
+                },
+            }, timeout=10)
+            self.notify('initialized', {})
+        except Exception:
+            self.process.kill()
+            raise
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def _send(self, message):
+        body = json.dumps(message).encode('utf-8')
+        with self._write_lock:
+            self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+            self.process.stdin.flush()
+
+    def _read_loop(self):
+        stdout = self.process.stdout
+        try:
+            while True:
+                length = None
+                while True:
+                    header = stdout.readline()
+                    if not header:
+                        return
+                    header = header.strip()
+                    if not header:
+                        break
+                    if header.lower().startswith(b'content-length:'):
+                        length = int(header.split(b':', 1)[1])
+
+                if length is None:
+                    continue
+                message = json.loads(stdout.read(length).decode('utf-8'))
+
+                if 'method' in message:
+                    # Server-to-client requests (configuration, progress, ...) get an empty reply
+                    if 'id' in message:
+                        result = None
+                        if message['method'] == 'workspace/configuration':
+                            result = [{} for _ in message.get('params', {}).get('items', [])]
+                        self._send({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+                    continue
+
+                pending = self._pending.pop(message.get('id'), None)
+                if pending:
+                    pending[1] = message
+                    pending[0].set()
+        finally:
+            # Wake up anyone still waiting on a response
+            for pending in list(self._pending.values()):
+                pending[0].set()
+            self._pending.clear()
+
+    def notify(self, method, params):
+        self._send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def request(self, method, params, timeout=5):
+        """Send a request and block until its response arrives"""
+        with self._write_lock:
+            self._next_id += 1
+            request_id = self._next_id
+        pending = [threading.Event(), None]
+        self._pending[request_id] = pending
+
+        self._send({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+        if not pending[0].wait(timeout):
+            self._pending.pop(request_id, None)
+            raise TimeoutError(f"gopls did not answer {method}")
+
+        response = pending[1]
+        if response is None:
+            raise RuntimeError("gopls exited")
+        if 'error' in response:
+            raise RuntimeError(response['error'].get('message', 'gopls error'))
+        return response.get('result')
+
+    def sync_document(self, file_name, text):
+        """Open or update `file_name` in gopls with `text`, returning its URI"""
+        uri = Path(file_name).as_uri()
+        with self._document_lock:
+            version = self._versions.get(uri, 0) + 1
+            self._versions[uri] = version
+
+            if version == 1:
+                self.notify('textDocument/didOpen', {
+                    'textDocument': {'uri': uri, 'languageId': 'go', 'version': version, 'text': text}
+                })
+            else:
+                self.notify('textDocument/didChange', {
+                    'textDocument': {'uri': uri, 'version': version},
+                    'contentChanges': [{'text': text}]
+                })
+        return uri
+
+    def close_document(self, uri):
+        """Close `uri` in gopls so it reads the file from disk again"""
+        with self._document_lock:
+            if self._versions.pop(uri, None) is not None:
+                self.notify('textDocument/didClose', {'textDocument': {'uri': uri}})
+
+    def format(self, file_name, text, organize_imports=False):
+        """Return `text` formatted by gopls, optionally organizing imports first"""
+        with self._document_lock:
+            uri = self.sync_document(file_name, text)
+            try:
+                if organize_imports:
+                    actions = self.request('textDocument/codeAction', {
+                        'textDocument': {'uri': uri},
+                        'range': {'start': {'line': 0, 'character': 0},
+                                  'end': {'line': 0, 'character': 0}},
+                        'context': {'diagnostics': [], 'only': ['source.organizeImports']}
+                    }) or []
+
+                    for action in actions:
+                        # A bare Command or an action without edits would leave imports
+                        # untouched; fail so the caller falls back to goimports
+                        if 'edit' not in action:
+                            raise RuntimeError("gopls returned organizeImports without edits")
+
+                        workspace_edit = action['edit'] or {}
+                        edits = list(workspace_edit.get('changes', {}).get(uri, []))
+                        for change in workspace_edit.get('documentChanges', []):
+                            if change.get('textDocument', {}).get('uri') == uri:
+                                edits.extend(change.get('edits', []))
+                        if edits:
+                            text = _apply_text_edits(text, edits)
+                            self.sync_document(file_name, text)
+
+                edits = self.request('textDocument/formatting', {
+                    'textDocument': {'uri': uri},
+                    'options': {'tabSize': 8, 'insertSpaces': False}
+                }) or []
+                return _apply_text_edits(text, edits)
+            finally:
+                # Don't leave a stale in-memory copy shadowing the file for later requests
+                self.close_document(uri)
+
+    def hover(self, file_name, text, line, character):
+        """Return the hover documentation at the given position, or an empty string"""
+        with self._document_lock:
+            uri = self.sync_document(file_name, text)
+            try:
+                result = self.request('textDocument/hover', {
+                    'textDocument': {'uri': uri},
+                    'position': {'line': line, 'character': character}
+                })
+            finally:
+                self.close_document(uri)
+        if not result:
+            return ""
+
+        contents = result.get('contents')
+        if isinstance(contents, dict):
+            return contents.get('value', "")
+        if isinstance(contents, list):
+            return "\n\n".join(c.get('value', "") if isinstance(c, dict) else c for c in contents)
+        return contents or ""
+
+    def shutdown(self):
+        try:
+            self.request('shutdown', None, timeout=2)
+            self.notify('exit', None)
+        except Exception:
+            pass
+        if self.alive():
+            self.process.terminate()
+
+
 class GoCommand(sublime_plugin.TextCommand):
     """Base class for Go commands with common functionality"""
 
     def get_go_env(self):
-        """Get Go environment variables"""
+        """Get Go environment variables (cached for the editor session)"""
+        env_data, error = self.load_go_env()
+        if error:
+            print(f"Failed to get Go env: {error}")
+        return env_data
+
+    def load_go_env(self):
+        """Return (cached Go environment, error text); the dict is empty on failure"""
+        global _go_env_cache, _go_env_time
+
+        if _go_env_cache is not None and time.monotonic() - _go_env_time < _GO_ENV_TTL:
+            return _go_env_cache, ""
+
+        try:
+            result = subprocess.run([_GO_BIN, 'env', '-json'],
+                                  capture_output=True, text=True, timeout=10)
+            if result.returncode != 0:
+                return {}, result.stderr
+            _go_env_cache = json.loads(result.stdout)
+            _go_env_time = time.monotonic()
+            return _go_env_cache, ""
+        except json.JSONDecodeError:
+            return {}, result.stdout
+        except Exception as e:
+            return {}, f"Error: {e}"
+
+    def get_go_env_keys(self, *keys):
+        """Get specific Go environment variables as a dict, without the full JSON dump"""
+        now = time.monotonic()
+        if _go_env_cache is not None and now - _go_env_time < _GO_ENV_TTL:
+            return {key: _go_env_cache.get(key, "") for key in keys}
+
+        cached = {key: _go_env_key_cache[key][1] for key in keys
+                  if key in _go_env_key_cache and now - _go_env_key_cache[key][0] < _GO_ENV_TTL}
+        if len(cached) == len(keys):
+            return cached
+
         try:
-            result = subprocess.run(['go', 'env', '-json'],
+            result = subprocess.run([_GO_BIN, 'env'] + list(keys),
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0:
-                return json.loads(result.stdout)
+                # `go env KEY...` prints one value per line, in the order requested
+                values = dict(zip(keys, result.stdout.splitlines()))
+                for key, value in values.items():
+                    _go_env_key_cache[key] = (now, value)
+                return values
         except Exception as e:
             print(f"Failed to get Go env: {e}")
         return {}
 
-    def get_project_root(self):
-        """Find the project root containing go.mod or fallback to current file dir"""
+    def _find_root_and_mod(self):
+        """Return (project root, whether a go.mod was found) from a single lookup"""
         view = self.view
         if not view.file_name():
-            return None
+            return None, False
 
-        current_dir = Path(view.file_name()).parent
+        current_dir = os.path.dirname(view.file_name())
 
-        # Look for go.mod up the directory tree
-        for parent in [current_dir] + list(current_dir.parents):
-            if (parent / 'go.mod').exists():
-                return str(parent)
+        # Look for go.mod up the directory tree, fallback to current file directory
+        mod_dir = _nearest_go_mod_dir(current_dir)
+        if mod_dir:
+            return mod_dir, True
+        return current_dir, False
 
-        # Fallback to current file directory
-        return str(current_dir)
+    def get_project_root(self):
+        """Find the project root containing go.mod or fallback to current file dir"""
+        return self._find_root_and_mod()[0]
 
     def has_go_mod(self, directory=None):
         """Check if go.mod exists in the directory or its parents"""
         if not directory:
-            directory = self.get_project_root()
+            return self._find_root_and_mod()[1]
 
-        if not directory:
-            return False
+        return _nearest_go_mod_dir(directory) is not None
 
-        current_dir = Path(directory)
-        for parent in [current_dir] + list(current_dir.parents):
-            if (parent / 'go.mod').exists():
-                return True
-        return False
+    def _classify(self):
+        """Return (is_single_file_program, is_simple_multi_file_main) for the view.
 
-    def is_single_file_program(self):
-        """Check if current file is a standalone Go program"""
+        Both checks share one buffer scan; the result is cached per view until
+        the buffer changes or is saved under another name.
+        """
+        # Saving under a new name doesn't bump change_count, so include the name
         file_name = self.view.file_name()
-        if not file_name or not file_name.endswith('.go'):
-            return False
-
-        content = self.view.substr(sublime.Region(0, self.view.size()))
+        key = (self.view.id(), self.view.change_count(), file_name)
+        cached = _detect_cache.get(key)
+        if cached is not None:
+            return cached
+
+        is_single = False
+        is_simple_multi = False
+
+        # Both checks require package main and standard library imports only.
+        # Searching the view directly avoids copying the buffer into Python;
+        # a failed find returns an empty Region(-1, -1).
+        if file_name and self.view.find('package main', 0, sublime.LITERAL):
+            import_paths = []
+            self.view.find_all(_IMPORT_PATTERN, 0, r'\1\2', import_paths)
+
+            if all(self.is_standard_library(path) for path in import_paths):
+                is_simple_multi = True
+                is_single = (file_name.endswith('.go') and
+                             bool(self.view.find(_MAIN_FUNC_PATTERN, 0)))
+
+        if len(_detect_cache) >= _DETECT_CACHE_SIZE:
+            _detect_cache.pop(next(iter(_detect_cache)))
+        _detect_cache[key] = (is_single, is_simple_multi)
+        return is_single, is_simple_multi
 
-        # Check for package main and main function
-        has_package_main = 'package main' in content
-        has_main_func = re.search(r'func\s+main\s*\(', content)
-
-        if not (has_package_main and has_main_func):
-            return False
-
-        # Check for imports that require modules
-        import_lines = re.findall(r'import\s+(?:"([^"]+)"|`([^`]+)`)', content)
-
-        for match in import_lines:
-            import_path = match[0] or match[1]
-
-            # Skip standard library packages
-            if self.is_standard_library(import_path):
-                continue
-
-            # Any non-standard library import requires modules
-            return False
-
-        return True
+    def is_single_file_program(self):
+        """Check if current file is a standalone Go program"""
+        return self._classify()[0]
 
     def is_standard_library(self, import_path):
         """Check if an import path is from the standard library"""
+        # Relative imports (./something) require modules
+        if import_path.startswith(('./', '../')):
+            return False
+
         # Standard library packages don't contain dots (except for some special cases)
         if '.' not in import_path:
             return True
 
-        # Known standard library packages with dots
-        std_lib_with_dots = [
-            'golang.org/x/crypto',
-            'golang.org/x/net',
-            'golang.org/x/text',
-            'golang.org/x/sys',
-            'golang.org/x/time'
-        ]
-
-        for std_pkg in std_lib_with_dots:
-            if import_path.startswith(std_pkg):
-                return True
-
-        # Relative imports (./something) require modules
-        if import_path.startswith('./') or import_path.startswith('../'):
-            return False
-
-        # Everything else with dots is likely external
-        return False
+        # Known standard library packages with dots; everything else is likely external
+        return import_path.startswith(_STD_DOT_PREFIXES)
 
     def is_simple_multi_file_main(self):
         """Check if this is a simple multi-file main package (no modules needed)"""
-        if not self.view.file_name():
-            return False
-
-        content = self.view.substr(sublime.Region(0, self.view.size()))
-
-        # Must be package main
-        if 'package main' not in content:
-            return False
-
-        # Check imports - only standard library allowed
-        import_lines = re.findall(r'import\s+(?:"([^"]+)"|`([^`]+)`)', content)
-
-        for match in import_lines:
-            import_path = match[0] or match[1]
-            if not self.is_standard_library(import_path):
-                return False
+        return self._classify()[1]
 
-        return True
+    def _is_module_free(self):
+        """Check if the file is a single file program or simple multi-file main package"""
+        is_single, is_simple_multi = self._classify()
+        return is_single or is_simple_multi
 
     def needs_module(self, command_args):
         """Determine if a command requires a module"""
-        # Commands that work without modules for single files
-        single_file_commands = ['run', 'fmt', 'vet']
-
-        # Commands that always need modules
-        module_required_commands = ['get', 'mod', 'install']
-
-        if any(arg in module_required_commands for arg in command_args):
-            return True
+        may_skip_module = False
+        for arg in command_args:
+            if arg in _MODULE_REQUIRED_COMMANDS:
+                return True
+            if arg in _SINGLE_FILE_COMMANDS or arg in _BUILD_TEST_COMMANDS:
+                may_skip_module = True
 
-        if any(arg in single_file_commands for arg in command_args):
+        if may_skip_module:
             # For single file programs or simple multi-file main packages, these commands don't need modules
-            if self.is_single_file_program() or self.is_simple_multi_file_main():
+            if self._is_module_free():
                 return False
             # For complex projects, they do need modules
             return True
 
-        # Build and test commands
-        if any(arg in ['build', 'test'] for arg in command_args):
-            # If it's a single file with package main or simple multi-file main, we can use different approach
-            if self.is_single_file_program() or self.is_simple_multi_file_main():
-                return False
-            return True
-
         return False
 
-    def show_output_panel(self, content, title="Go Output"):
-        """Show output in a panel"""
+    def format_with_gopls(self, file_name, organize_imports=False, text=None):
+        """Format `text` (or the file on disk) through the shared gopls process.
+
+        Returns None to fall back to the gofmt/goimports subprocess.
+        """
+        client = _GoplsClient.get()
+        if not client:
+            return None
+
+        try:
+            if text is None:
+                with open(file_name, 'rb') as source:
+                    text = source.read().decode('utf-8')
+            return client.format(file_name, text, organize_imports)
+        except Exception as e:
+            print(f"gopls formatting failed, falling back: {e}")
+            return None
+
+    def format_source(self):
+        """Return (buffer text or None, change count) to format at dispatch time.
+
+        Clean buffers match the file on disk, which is streamed to the formatter
+        directly; dirty buffers are formatted from their unsaved text.
+        """
+        text = None
+        if self.view.is_dirty():
+            text = self.view.substr(sublime.Region(0, self.view.size()))
+        return text, self.view.change_count()
+
+    def apply_formatted(self, text, change_count, chain=None, resave=False):
+        """Apply formatter output, re-save if requested, then run follow-up commands"""
+        # The buffer was edited while the formatter ran; applying would revert those edits
+        if self.view.change_count() != change_count:
+            sublime.status_message("Go: buffer changed while formatting, result discarded")
+            return
+
+        self.view.run_command('go_apply_format', {'text': text, 'change_count': change_count})
+
+        # Format on save runs after the write, so save again to put the
+        # formatted text on disk before any chained build reads it
+        if resave and self.view.is_dirty():
+            _resaving_views.add(self.view.id())
+            try:
+                self.view.run_command('save')
+            finally:
+                _resaving_views.discard(self.view.id())
+
+        self.run_chain(chain)
+
+    def run_chain(self, chain):
+        """Run follow-up commands (e.g. ['build'] -> go_build) after formatting"""
+        for name in chain or []:
+            self.view.run_command(f"go_{name}")
+
+    def show_output_panel(self, content, title="Go Output", clear=False):
+        """Show output in a panel, appending to the window's existing panel unless clear is set"""
         window = self.view.window()
-        panel = window.create_output_panel("go_output")
-        panel.set_syntax_file("Packages/Text/Plain text.tmLanguage")
-        panel.run_command('append', {'characters': content})
+        # Drop panels of windows that have since been closed
+        for window_id in [k for k, p in _panels.items() if not p.is_valid()]:
+            del _panels[window_id]
+        panel = _panels.get(window.id())
+        if clear or panel is None or not panel.is_valid():
+            panel = window.create_output_panel("go_output")
+            panel.set_syntax_file("Packages/Text/Plain text.tmLanguage")
+            _panels[window.id()] = panel
+        elif panel.size():
+            content = "\n\n" + content
+        panel.run_command('append', {'characters': content, 'force': True, 'scroll_to_end': True})
         window.run_command('show_panel', {'panel': 'output.go_output'})
 
     def prompt_create_module(self, callback):
@@ -195,12 +716,13 @@ class GoCommand(sublime_plugin.TextCommand):
 
         def create_thread():
             try:
-                cmd = ['go', 'mod', 'init', module_name]
+                cmd = [_GO_BIN, 'mod', 'init', module_name]
                 result = subprocess.run(cmd, cwd=root_dir, capture_output=True,
                                       text=True, timeout=30)
 
                 def handle_result():
                     if result.returncode == 0:
+                        _project_root_cache.clear()
                         self.show_output_panel(f"Created go.mod with module: {module_name}")
                         if callback:
                             callback()
@@ -213,18 +735,22 @@ class GoCommand(sublime_plugin.TextCommand):
             except Exception as e:
                 sublime.set_timeout(lambda: self.show_output_panel(f"Error creating module: {e}"), 0)
 
-        threading.Thread(target=create_thread).start()
+        _EXECUTOR.submit(create_thread)
 
     def run_go_command(self, args, cwd=None, callback=None, force_check_mod=None):
         """Run a go command asynchronously with smart module handling"""
+        found_go_mod = None
         if not cwd:
-            cwd = self.get_project_root()
+            cwd, found_go_mod = self._find_root_and_mod()
 
         # Determine if we need modules for this command
         check_mod = force_check_mod if force_check_mod is not None else self.needs_module(args)
 
         # Only enforce module requirement if really needed
-        if check_mod and not self.has_go_mod(cwd):
+        if check_mod and found_go_mod is None:
+            found_go_mod = self.has_go_mod(cwd)
+
+        if check_mod and not found_go_mod:
             settings = sublime.load_settings("GoBuild.sublime-settings")
             auto_create = settings.get("auto_create_mod", False)  # Default to False for less intrusion
 
@@ -251,27 +777,29 @@ class GoCommand(sublime_plugin.TextCommand):
 
         def run_thread():
             try:
-                cmd = ['go'] + args
+                cmd = [_GO_BIN] + args
                 result = subprocess.run(cmd, cwd=cwd, capture_output=True,
                                       text=True, timeout=30)
 
                 if callback:
                     sublime.set_timeout(lambda: callback(result), 0)
                 else:
-                    output = f"Command: {' '.join(cmd)}\nDirectory: {cwd}\n\n"
+                    # Assemble the full text here so the UI thread only has to append it
+                    parts = [f"Command: go {' '.join(args)}\nDirectory: {cwd}\n\n"]
                     if result.stdout:
-                        output += f"Output:\n{result.stdout}\n"
+                        parts.append(f"Output:\n{result.stdout}\n")
                     if result.stderr:
-                        output += f"Errors:\n{result.stderr}\n"
-                    output += f"\nExit code: {result.returncode}"
+                        parts.append(f"Errors:\n{result.stderr}\n")
+                    parts.append(f"\nExit code: {result.returncode}")
+                    output = "".join(parts)
 
-                    sublime.set_timeout(lambda: self.show_output_panel(output), 0)
+                    sublime.set_timeout(lambda: self.show_output_panel(output, clear=True), 0)
             except subprocess.TimeoutExpired:
                 sublime.set_timeout(lambda: self.show_output_panel("Command timed out"), 0)
             except Exception as e:
                 sublime.set_timeout(lambda: self.show_output_panel(f"Error: {e}"), 0)
 
-        threading.Thread(target=run_thread).start()
+        _EXECUTOR.submit(run_thread)
 
 
 class GoBuildCommand(GoCommand):
@@ -350,43 +878,30 @@ class GoTestFunctionCommand(GoCommand):
     """Run specific test function under cursor"""
 
     def run(self, edit):
-        # Find test function name under cursor
+        # Find all test functions in one scan, then pick the nearest one
+        # starting on or above the cursor line
         cursor = self.view.sel()[0].begin()
-        line_region = self.view.line(cursor)
-        line_content = self.view.substr(line_region)
-
-        # Look for test function pattern
-        test_match = re.search(r'func\s+(Test\w+)', line_content)
-        if test_match:
-            test_name = test_match.group(1)
+        line_end = self.view.line(cursor).end()
 
-            file_name = self.view.file_name()
-            if self.is_single_file_program() and file_name:
-                # Single file test
-                self.run_go_command(['test', '-run', f'^{test_name}$', os.path.basename(file_name)],
-                                  cwd=os.path.dirname(file_name), force_check_mod=False)
-            else:
-                # Module-based test
-                self.run_go_command(['test', '-v', '-run', f'^{test_name}$', '.'])
-        else:
-            # Search upward for test function
-            current_line = self.view.rowcol(cursor)[0]
-            for line_num in range(current_line, max(0, current_line - 50), -1):
-                line_region = self.view.line(self.view.text_point(line_num, 0))
-                line_content = self.view.substr(line_region)
-                test_match = re.search(r'func\s+(Test\w+)', line_content)
-                if test_match:
-                    test_name = test_match.group(1)
-
-                    file_name = self.view.file_name()
-                    if self.is_single_file_program() and file_name:
-                        self.run_go_command(['test', '-run', f'^{test_name}$', os.path.basename(file_name)],
-                                          cwd=os.path.dirname(file_name), force_check_mod=False)
-                    else:
-                        self.run_go_command(['test', '-v', '-run', f'^{test_name}$', '.'])
-                    return
+        names = []
+        regions = self.view.find_all(_TEST_FUNC_PATTERN, 0, r'\1', names)
+        starts = [region.begin() for region in regions]
+        index = bisect.bisect_right(starts, line_end) - 1
 
+        if index < 0:
             self.show_output_panel("No test function found near cursor")
+            return
+
+        test_name = names[index]
+
+        file_name = self.view.file_name()
+        if self.is_single_file_program() and file_name:
+            # Single file test
+            self.run_go_command(['test', '-run', f'^{test_name}$', os.path.basename(file_name)],
+                              cwd=os.path.dirname(file_name), force_check_mod=False)
+        else:
+            # Module-based test
+            self.run_go_command(['test', '-v', '-run', f'^{test_name}$', '.'])
 
 
 class GoBenchmarkCommand(GoCommand):
@@ -418,65 +933,133 @@ class GoVetCommand(GoCommand):
 class GoFmtCommand(GoCommand):
     """Format current file with gofmt"""
 
-    def run(self, edit):
+    def run(self, edit, chain=None, resave=False, change_count=None):
         file_name = self.view.file_name()
         if file_name and file_name.endswith('.go'):
-            def format_callback(result):
-                if result.returncode == 0 and result.stdout:
-                    # Replace file content with formatted version
-                    region = sublime.Region(0, self.view.size())
-                    self.view.replace(edit, region, result.stdout)
+            text, current_count = self.format_source()
+            # Format on save passes the count from on_pre_save; skip if edited since
+            if change_count is not None and change_count != current_count:
+                return
+            change_count = current_count
+
+            def format_callback(returncode, output, errors):
+                if returncode == 0 and output:
+                    # Apply only the lines gofmt changed
+                    self.apply_formatted(output, change_count, chain, resave)
                 else:
-                    self.show_output_panel(result.stderr or "Formatting failed")
+                    self.show_output_panel(errors or "Formatting failed")
 
-            try:
-                with open(file_name, 'r') as f:
-                    content = f.read()
+            def run_thread():
+                formatted = self.format_with_gopls(file_name, text=text)
+                if formatted is not None:
+                    sublime.set_timeout(lambda: format_callback(0, formatted, ""), 0)
+                    return
 
-                def run_thread():
+                source = None
+                if text is None:
                     try:
-                        result = subprocess.run(['gofmt'], input=content,
-                                              capture_output=True, text=True, timeout=10)
-                        sublime.set_timeout(lambda: format_callback(result), 0)
+                        source = open(file_name, 'rb')
                     except Exception as e:
-                        sublime.set_timeout(lambda: self.show_output_panel(f"Format error: {e}"), 0)
+                        sublime.set_timeout(lambda: self.show_output_panel(f"Error reading file: {e}"), 0)
+                        return
 
-                threading.Thread(target=run_thread).start()
-            except Exception as e:
-                self.show_output_panel(f"Error reading file: {e}")
+                try:
+                    if source:
+                        # Hand the file straight to gofmt instead of reading it in Python first
+                        with source:
+                            result = subprocess.run([_GOFMT_BIN], stdin=source,
+                                                  capture_output=True, timeout=10)
+                    else:
+                        result = subprocess.run([_GOFMT_BIN], input=text.encode('utf-8'),
+                                              capture_output=True, timeout=10)
+                    output = result.stdout.decode('utf-8')
+                    errors = result.stderr.decode('utf-8', 'replace')
+                    sublime.set_timeout(lambda: format_callback(result.returncode, output, errors), 0)
+                except Exception as e:
+                    sublime.set_timeout(lambda: self.show_output_panel(f"Format error: {e}"), 0)
+
+            _EDITOR_EXECUTOR.submit(run_thread)
 
 
 class GoImportsCommand(GoCommand):
     """Fix imports with goimports"""
 
-    def run(self, edit):
+    def run(self, edit, chain=None, resave=False, change_count=None):
         file_name = self.view.file_name()
         if file_name and file_name.endswith('.go'):
-            def imports_callback(result):
-                if result.returncode == 0 and result.stdout:
-                    region = sublime.Region(0, self.view.size())
-                    self.view.replace(edit, region, result.stdout)
+            text, current_count = self.format_source()
+            # Format on save passes the count from on_pre_save; skip if edited since
+            if change_count is not None and change_count != current_count:
+                return
+            change_count = current_count
+
+            def imports_callback(returncode, output, errors):
+                if returncode == 0 and output:
+                    self.apply_formatted(output, change_count, chain, resave)
                 else:
-                    self.show_output_panel(result.stderr or "goimports failed")
+                    self.show_output_panel(errors or "goimports failed")
 
-            try:
-                with open(file_name, 'r') as f:
-                    content = f.read()
+            def run_thread():
+                formatted = self.format_with_gopls(file_name, organize_imports=True, text=text)
+                if formatted is not None:
+                    sublime.set_timeout(lambda: imports_callback(0, formatted, ""), 0)
+                    return
 
-                def run_thread():
+                source = None
+                if text is None:
                     try:
-                        result = subprocess.run(['goimports'], input=content,
-                                              capture_output=True, text=True, timeout=10)
-                        sublime.set_timeout(lambda: imports_callback(result), 0)
-                    except FileNotFoundError:
-                        sublime.set_timeout(lambda: self.show_output_panel(
-                            "goimports not found. Install with: go install golang.org/x/tools/cmd/goimports@latest"), 0)
+                        source = open(file_name, 'rb')
                     except Exception as e:
-                        sublime.set_timeout(lambda: self.show_output_panel(f"goimports error: {e}"), 0)
+                        sublime.set_timeout(lambda: self.show_output_panel(f"Error reading file: {e}"), 0)
+                        return
+
+                try:
+                    if source:
+                        with source:
+                            result = subprocess.run([_GOIMPORTS_BIN], stdin=source,
+                                                  capture_output=True, timeout=10)
+                    else:
+                        result = subprocess.run([_GOIMPORTS_BIN], input=text.encode('utf-8'),
+                                              capture_output=True, timeout=10)
+                    output = result.stdout.decode('utf-8')
+                    errors = result.stderr.decode('utf-8', 'replace')
+                    sublime.set_timeout(lambda: imports_callback(result.returncode, output, errors), 0)
+                except FileNotFoundError:
+                    sublime.set_timeout(lambda: self.show_output_panel(
+                        "goimports not found. Install with: go install golang.org/x/tools/cmd/goimports@latest"), 0)
+                except Exception as e:
+                    sublime.set_timeout(lambda: self.show_output_panel(f"goimports error: {e}"), 0)
+
+            _EDITOR_EXECUTOR.submit(run_thread)
 
-                threading.Thread(target=run_thread).start()
-            except Exception as e:
-                self.show_output_panel(f"Error reading file: {e}")
+
+class GoApplyFormatCommand(sublime_plugin.TextCommand):
+    """Replace the buffer with formatted text, touching only the changed lines"""
+
+    def run(self, edit, text, change_count=None):
+        # Never overwrite edits made after the formatter was given its input
+        if change_count is not None and self.view.change_count() != change_count:
+            return
+
+        original = self.view.substr(sublime.Region(0, self.view.size()))
+        if original == text:
+            return
+
+        original_lines = original.splitlines(keepends=True)
+        formatted_lines = text.splitlines(keepends=True)
+
+        # Offset of the start of each original line (plus one past the end)
+        line_starts = [0]
+        for line in original_lines:
+            line_starts.append(line_starts[-1] + len(line))
+
+        matcher = difflib.SequenceMatcher(None, original_lines, formatted_lines)
+        # Apply hunks from the end so earlier offsets stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == 'equal':
+                continue
+            region = sublime.Region(line_starts[i1], line_starts[i2])
+            self.view.replace(edit, region, ''.join(formatted_lines[j1:j2]))
 
 
 class GoModInitCommand(GoCommand):
@@ -570,10 +1153,39 @@ class GoDocCommand(GoCommand):
         word_region = self.view.word(cursor)
         word = self.view.substr(word_region)
 
-        if word:
-            self.run_go_command(['doc', word], force_check_mod=False)
-        else:
+        if not word:
             self.show_output_panel("No symbol selected")
+            return
+
+        cwd = self.get_project_root()
+        file_name = self.view.file_name()
+        use_gopls = bool(file_name and file_name.endswith('.go') and _GoplsClient.enabled())
+
+        if use_gopls:
+            # gopls positions count UTF-16 code units within the line
+            text = self.view.substr(sublime.Region(0, self.view.size()))
+            row, col = self.view.rowcol(cursor.begin())
+            line_text = self.view.substr(self.view.line(cursor.begin()))
+            character = _utf16_len(line_text[:col])
+
+        def doc_thread():
+            doc = ""
+            client = _GoplsClient.get() if use_gopls else None
+            if client:
+                try:
+                    doc = client.hover(file_name, text, row, character)
+                except Exception as e:
+                    print(f"gopls hover failed, falling back to go doc: {e}")
+
+            if not doc:
+                try:
+                    doc = _go_doc(word, self.get_go_env_keys('GOVERSION').get('GOVERSION', ''), cwd)
+                except Exception as e:
+                    doc = f"Error: {e}"
+
+            sublime.set_timeout(lambda: self.show_output_panel(doc), 0)
+
+        _EDITOR_EXECUTOR.submit(doc_thread)
 
 
 class GoPlaygroundCommand(GoCommand):
@@ -584,72 +1196,77 @@ class GoPlaygroundCommand(GoCommand):
 
         def playground_thread():
             try:
-                import urllib.request
-                import urllib.parse
+                share_id = _playground_share(content)
+                url = f"https://play.golang.org/p/{share_id}"
 
-                data = urllib.parse.urlencode({'body': content}).encode()
-                req = urllib.request.Request('https://play.golang.org/share', data=data)
-
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    share_id = response.read().decode()
-                    url = f"https://play.golang.org/p/{share_id}"
-
-                    sublime.set_timeout(lambda: self.show_output_panel(
-                        f"Playground URL: {url}\n\nURL copied to clipboard!"), 0)
-                    sublime.set_timeout(lambda: sublime.set_clipboard(url), 0)
+                sublime.set_timeout(lambda: self.show_output_panel(
+                    f"Playground URL: {url}\n\nURL copied to clipboard!"), 0)
+                sublime.set_timeout(lambda: sublime.set_clipboard(url), 0)
 
             except Exception as e:
                 sublime.set_timeout(lambda: self.show_output_panel(f"Playground error: {e}"), 0)
 
-        threading.Thread(target=playground_thread).start()
+        _EDITOR_EXECUTOR.submit(playground_thread)
 
 
 class GoEnvironmentCommand(GoCommand):
     """Show Go environment information"""
 
     def run(self, edit):
-        def env_callback(result):
-            if result.returncode == 0:
-                try:
-                    env_data = json.loads(result.stdout)
-                    output = "Go Environment:\n" + "="*50 + "\n"
-                    for key, value in sorted(env_data.items()):
-                        output += f"{key}: {value}\n"
-
-                    # Add file and module status
-                    output += "\n" + "="*50 + "\n"
-
-                    file_name = self.view.file_name()
-                    if file_name:
-                        output += f"Current File: {os.path.basename(file_name)}\n"
-                        if self.is_single_file_program():
-                            output += "File Type: ✓ Single file program (no module needed)\n"
-                        else:
-                            output += "File Type: Multi-file project (module recommended)\n"
-
-                    if self.has_go_mod():
-                        output += "Module Status: ✓ go.mod found\n"
-                        mod_root = self.get_project_root()
-                        if mod_root:
-                            try:
-                                with open(os.path.join(mod_root, 'go.mod'), 'r') as f:
-                                    first_line = f.readline().strip()
-                                    if first_line.startswith('module '):
-                                        output += f"Module Name: {first_line[7:]}\n"
-                            except:
-                                pass
-                    else:
-                        output += "Module Status: ✗ No go.mod found\n"
-                        if not self.is_single_file_program():
-                            output += "Recommendation: Run 'Go: Initialize Module' for multi-file projects\n"
+        def env_thread():
+            env_data, error = self.load_go_env()
+            sublime.set_timeout(lambda: self.show_environment(env_data, error), 0)
 
-                    self.show_output_panel(output)
-                except json.JSONDecodeError:
-                    self.show_output_panel(result.stdout)
+        _EDITOR_EXECUTOR.submit(env_thread)
+
+    def show_environment(self, env_data, error=""):
+        if not env_data:
+            self.show_output_panel(error or "Failed to get Go environment", clear=True)
+            return
+
+        output = "Go Environment:\n" + "="*50 + "\n"
+        for key, value in sorted(env_data.items()):
+            output += f"{key}: {value}\n"
+
+        # Add file and module status
+        output += "\n" + "="*50 + "\n"
+
+        file_name = self.view.file_name()
+        if file_name:
+            output += f"Current File: {os.path.basename(file_name)}\n"
+            if self.is_single_file_program():
+                output += "File Type: ✓ Single file program (no module needed)\n"
             else:
-                self.show_output_panel(result.stderr or "Failed to get Go environment")
+                output += "File Type: Multi-file project (module recommended)\n"
+
+        if self.has_go_mod():
+            output += "Module Status: ✓ go.mod found\n"
+            mod_root = self.get_project_root()
+            if mod_root:
+                try:
+                    with open(os.path.join(mod_root, 'go.mod'), 'r') as f:
+                        first_line = f.readline().strip()
+                        if first_line.startswith('module '):
+                            output += f"Module Name: {first_line[7:]}\n"
+                except:
+                    pass
+        else:
+            output += "Module Status: ✗ No go.mod found\n"
+            if not self.is_single_file_program():
+                output += "Recommendation: Run 'Go: Initialize Module' for multi-file projects\n"
+
+        self.show_output_panel(output, clear=True)
 
-        self.run_go_command(['env', '-json'], callback=env_callback, force_check_mod=False)
+
+class GoRefreshEnvCommand(GoCommand):
+    """Discard the cached Go environment and doc lookups, then show the environment"""
+
+    def run(self, edit):
+        global _go_env_cache
+        _go_env_cache = None
+        _go_env_key_cache.clear()
+        _go_doc.cache_clear()
+        self.view.run_command('go_environment')
 
 
 class GoVersionCommand(GoCommand):
@@ -661,11 +1278,76 @@ class GoVersionCommand(GoCommand):
 
 # Auto-format on save (optional - can be enabled in settings)
 class GoFormatOnSave(sublime_plugin.EventListener):
+    # Saves within this window collapse into a single format run
+    DEBOUNCE_MS = 150
+
+    def __init__(self):
+        # on_pre_save runs on the UI thread, _maybe_format on the async thread
+        self._last_save = {}
+        self._lock = threading.Lock()
+
     def on_pre_save(self, view):
+        # Skip the save issued after applying the formatted text
+        if view.id() in _resaving_views:
+            return
+
         settings = sublime.load_settings("GoBuild.sublime-settings")
         if (settings.get("format_on_save", False) and
             view.file_name() and view.file_name().endswith('.go')):
-            if settings.get("use_goimports", True):
-                view.run_command('go_imports')
-            else:
-                view.run_command('go_fmt')
+            timestamp = time.monotonic()
+            change_count = view.change_count()
+            with self._lock:
+                self._last_save[view.id()] = timestamp
+            sublime.set_timeout_async(
+                lambda: self._maybe_format(view, timestamp, change_count), self.DEBOUNCE_MS)
+
+    def _maybe_format(self, view, timestamp, change_count):
+        # A newer save superseded this one, or the view has since been closed
+        with self._lock:
+            if self._last_save.get(view.id()) != timestamp:
+                return
+            self._last_save.pop(view.id(), None)
+        if not view.is_valid():
+            return
+
+        settings = sublime.load_settings("GoBuild.sublime-settings")
+        # Formatting only applies (and re-saves) if nothing was typed since the save;
+        # otherwise it is skipped and the next save formats instead
+        args = {
+            'chain': settings.get("format_on_save_chain", []),
+            'resave': True,
+            'change_count': change_count,
+        }
+        if settings.get("use_goimports", True):
+            view.run_command('go_imports', args)
+        else:
+            view.run_command('go_fmt', args)
+
+
+class GoModCacheListener(sublime_plugin.EventListener):
+    """Drop cached lookups that a saved go.mod or Go source file may have invalidated"""
+
+    def on_post_save(self, view):
+        file_name = view.file_name()
+        if not file_name:
+            return
+
+        if os.path.basename(file_name) == 'go.mod':
+            _project_root_cache.clear()
+
+        # Docs for the project's own symbols change as its sources are edited
+        if file_name.endswith('.go') or os.path.basename(file_name) == 'go.mod':
+            _go_doc.cache_clear()
+
+
+def plugin_loaded():
+    _resolve_binaries()
+    settings = sublime.load_settings("GoBuild.sublime-settings")
+    settings.add_on_change("gobuild_binaries", _resolve_binaries)
+
+
+def plugin_unloaded():
+    sublime.load_settings("GoBuild.sublime-settings").clear_on_change("gobuild_binaries")
+    _GoplsClient.stop()
+    _EXECUTOR.shutdown(wait=False)
+    _EDITOR_EXECUTOR.shutdown(wait=False)